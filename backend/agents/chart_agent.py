@@ -1,11 +1,18 @@
 # backend/agents/chart_agent.py
 
+from types import MappingProxyType
+
+# Shared, read-only stub payload; callers always receive a fresh dict
+_STUB_CHART = MappingProxyType({"data": "stub chart data"})
+
 class ChartAgent:
     """
     Modular agent that generates all standard and custom charts/visualizations
     (trend, bar, pie, waterfall, etc.) for financial metrics and variances.
     """
 
+    _inputs = ("metrics_calculator", "variance_analysis")
+
     def __init__(self):
         # Placeholder for chart config, templates, etc.
         pass
@@ -23,7 +30,4 @@ class ChartAgent:
             dict: Chart output (currently stubbed)
         """
         # TODO: Implement actual chart/visualization logic.
-        return {
-            "chart_type": chart_type,
-            "data": "stub chart data"
-        }
+        return {"chart_type": chart_type, **_STUB_CHART}
@@ -1,11 +1,18 @@
 # backend/agents/chunker_agent.py
 
+from types import MappingProxyType
+
+# Immutable template for the single stub chunk
+_STUB_CHUNK = MappingProxyType({"chunk_id": 0, "text": "stub chunk", "type": "section"})
+
 class ChunkerAgent:
     """
     Modular agent that splits a processed financial document into retrievable chunks
     (sections, tables, paragraphs, etc.) for downstream analysis.
     """
 
+    _inputs = ("doc_processor",)
+
     def __init__(self):
         # Placeholder for future configuration, if needed
         pass
@@ -21,6 +28,4 @@ class ChunkerAgent:
             list: List of chunk dicts (currently stubbed)
         """
         # TODO: Implement actual chunking logic.
-        return [
-            {"chunk_id": 0, "text": "stub chunk", "type": "section"}
-        ]
+        return [dict(_STUB_CHUNK)]
@@ -2,9 +2,13 @@
 ContextStitcherAgent stitches together contextual information from multiple sources for use in the financial analytics pipeline.
 """
 
+from types import MappingProxyType
+
+_STUB_CONTEXT = MappingProxyType({"context": "Dummy stitched context."})
+
 class ContextStitcherAgent:
     def __init__(self):
         pass
 
     def stitch_context(self, *args, **kwargs):
-        return {"context": "Dummy stitched context."}
+        return dict(_STUB_CONTEXT)
@@ -1,35 +1,316 @@
 import os
-import pandas as pd
+import csv
 import json
 import logging
 import re
-from typing import Tuple, Dict, Any
+import hashlib
+import tempfile
+import importlib.util
+import multiprocessing
+import threading
+from io import BytesIO
 from pathlib import Path
-import pdfplumber
-from io import StringIO
+from typing import Tuple, Dict, Any, List, Optional, ClassVar, Sequence
+from collections import OrderedDict
+from functools import partial, lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# PDFs with more pages than this are parsed across a process pool
+PARALLEL_MIN_PAGES = 4
+# PDFs smaller than this are parsed from an in-memory buffer instead of a file handle
+IN_MEMORY_PDF_BYTES = 500 * 1024 * 1024
+# Number of parsed files kept in the in-process cache
+CACHE_SIZE = 32
+# Part of every cache key; bump it when a loader's output changes so older cached entries are not served
+CACHE_VERSION = 1
+_NON_WORD = re.compile(r'\W+')
+# ASCII characters outside \w become spaces, so str.split() collapses each run without the regex engine
+_ASCII_NON_WORD = str.maketrans({chr(i): ' ' for i in range(128) if _NON_WORD.match(chr(i))})
+# Label given to headers that are empty or entirely punctuation
+_UNNAMED = 'unnamed'
+# CSV files larger than this are memory-mapped instead of read through buffered I/O
+MMAP_MIN_BYTES = 100 * 1024 * 1024
+# Without pyarrow, CSVs larger than this are read by the C engine in CSV_CHUNK_ROWS-row chunks
+CHUNKED_MIN_BYTES = 16 * 1024 * 1024
+CSV_CHUNK_ROWS = 64 * 1024
+_PANDAS_VERSION = tuple(int(x) for x in pd.__version__.split('.')[:2])
+# pandas gained engine='calamine' in 2.2; older versions read through python-calamine directly
+_PANDAS_CALAMINE = _PANDAS_VERSION >= (2, 2)
+# Copy-on-write is always on from pandas 3, where a shallow copy is enough to isolate cache entries
+_COPY_ON_WRITE = _PANDAS_VERSION >= (3, 0)
+# Multi-threaded Arrow CSV parsing when pyarrow is available
+_HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+# Arrow CSV block size: large enough that each parser thread gets a sizeable slice of the file
+CSV_BLOCK_BYTES = 8 << 20
+# Block size for Arrow's newline-delimited JSON reader
+JSON_BLOCK_BYTES = 8 << 20
+# Leading bytes of a TXT file inspected to decide whether it is comma-separated
+SNIFF_BYTES = 4096
+# Errors meaning "not parseable as CSV"; pyarrow's ArrowInvalid and pandas' EmptyDataError subclass ValueError
+_CSV_PARSE_ERRORS = (pd.errors.ParserError, UnicodeDecodeError, ValueError)
+# Arrow -> pandas conversion keeps the default numpy dtypes, so frames match the C-engine paths;
+# split_blocks gives each column its own block instead of consolidating them through a copy
+_ARROW_TO_PANDAS = dict(split_blocks=True)
+# Shared PDF worker pool, see _worker_pool()
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''): h.update(chunk)
+    return h.hexdigest()
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _stat_digest(path: str, mtime_ns: int, size: int) -> str:
+    """Content digest memoized on (path, mtime, size), so an unchanged file is hashed once per process."""
+    return _file_digest(path)
+
+def _pdf_bytes(path: str) -> Optional[bytes]:
+    """Read the whole PDF in one call when it is small enough to keep in memory."""
+    return Path(path).read_bytes() if os.path.getsize(path) < IN_MEMORY_PDF_BYTES else None
+
+def _open_pdf(path: str):
+    data = _pdf_bytes(path)
+    fitz = importlib.import_module('fitz')
+    return fitz.open(path) if data is None else fitz.open(stream=data, filetype='pdf')
+
+def _page_text(page) -> str:
+    return page.get_text('text')
+
+def _page_tables(page) -> List[List[List[str]]]:
+    return [t.extract() for t in page.find_tables().tables]
+
+def _clean_table(table: List[List[Optional[str]]]) -> List[List[str]]:
+    """Replace empty cells with '' and strip whitespace, returning already-clean tables untouched."""
+    if all(c is not None and c == c.strip() for row in table for c in row): return table
+    return [[(c or '').strip() for c in row] for row in table]
+
+def _read_csv_arrow(src, columns: Optional[Sequence[str]] = None, mmap: bool = False,
+                    schema: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """Parse CSV with pyarrow's multi-threaded reader.
+
+    `src` is a path or binary buffer; with `mmap` the path is memory-mapped so the OS pages it in.
+    `schema` maps column names to types so those columns skip type inference.
+    """
+    pa, pa_csv = importlib.import_module('pyarrow'), importlib.import_module('pyarrow.csv')
+    read = pa_csv.ReadOptions(use_threads=True, block_size=CSV_BLOCK_BYTES)
+    convert = pa_csv.ConvertOptions(strings_can_be_null=True)
+    if columns is not None: convert.include_columns = list(columns)
+    if schema: convert.column_types = dict(schema)
+    if mmap:
+        with pa.memory_map(src, 'r') as f: table = pa_csv.read_csv(f, read_options=read, convert_options=convert)
+    else:
+        table = pa_csv.read_csv(src, read_options=read, convert_options=convert)
+    return table.to_pandas(**_ARROW_TO_PANDAS)
+
+def _read_json_lines(p: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Parse newline-delimited JSON, one record per line, flattening nested objects one level."""
+    if _HAS_PYARROW:
+        pa_json = importlib.import_module('pyarrow.json')
+        read = pa_json.ReadOptions(use_threads=True, block_size=JSON_BLOCK_BYTES)
+        table = pa_json.read_json(p, read_options=read).flatten()
+        if columns is not None: table = table.select(list(columns))
+        return table.to_pandas(**_ARROW_TO_PANDAS)
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(p, 'rb') as f: df = pd.json_normalize([loads(line) for line in f if line.strip()], max_level=1)
+    return df[list(columns)] if columns is not None else df
+
+def _sniff_csv(raw: bytes) -> bool:
+    """False only when the leading sample is clearly not comma-delimited, so plain text skips the CSV parser."""
+    head = raw[:SNIFF_BYTES]
+    # Drop the trailing partial line so a truncated row does not look like an inconsistent one
+    if len(raw) > SNIFF_BYTES: head = head.rpartition(b'\n')[0] or head
+    # A single-column CSV has no delimiter for the sniffer to find, so it is still tried as CSV
+    if b',' not in head: return True
+    try: return csv.Sniffer().sniff(head.decode('utf-8', errors='ignore'), delimiters=',').delimiter == ','
+    except csv.Error: return False
+
+def _read_excel_calamine(path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    from python_calamine import CalamineWorkbook
+    rows = CalamineWorkbook.from_path(path).get_sheet_by_index(0).to_python()
+    df = pd.DataFrame(rows[1:], columns=rows[0])
+    return df[list(columns)] if columns is not None else df
+
+def _to_numeric(col: pd.Series) -> pd.Series:
+    try: return pd.to_numeric(col)
+    except (ValueError, TypeError): return col
+
+def _column_values(col: pd.Series) -> list:
+    """Column as a Python list with missing cells (pd.NA / NaN) as None, so it stays JSON-serializable."""
+    if not col.hasnans: return col.tolist()
+    return col.astype(object).where(col.notna(), None).tolist()
+
+def _merge_tables(tables: List[List[List[str]]]) -> Optional[Tuple[List[str], List[List[str]]]]:
+    """Stack every table under the first one's header, skipping repeated header rows.
+
+    Tables split across pages or rows come back as separate pieces of the same width; any table of
+    a different width means the pieces disagree, and None sends the caller to the text path.
+    """
+    if not tables: return None
+    (header, *body), rest = tables[0], tables[1:]
+    for table in rest:
+        if len(table[0]) != len(header): return None
+        body.extend(table[1:] if table[0] == header else table)
+    return header, body
+
+def _worker_pool() -> ProcessPoolExecutor:
+    """Module-wide process pool, created on first use.
+
+    Workers start via forkserver (spawn where unavailable), never fork, so the pool is safe to
+    create from the orchestrator's worker threads.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _POOL = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context(method))
+        return _POOL
+
+def _page_ranges(n: int) -> List[Tuple[int, int]]:
+    """Split n pages into one contiguous [start, end) range per worker."""
+    step = -(-n // (os.cpu_count() or 1))
+    return [(start, min(start + step, n)) for start in range(0, n, step)]
+
+def _run_ranges(func, path: str, n: int) -> list:
+    """Run func(path, start, end) over per-worker page ranges on the shared pool, concatenating results."""
+    global _POOL
+    try:
+        futures = [_worker_pool().submit(func, path, start, end) for start, end in _page_ranges(n)]
+        return [r for f in futures for r in f.result()]
+    except BrokenProcessPool:
+        # A crashed worker breaks the whole pool; drop it so the next call starts a fresh one
+        with _POOL_LOCK: _POOL = None
+        raise
+
+def _on_pages(func, path: str, start: int, end: int) -> list:
+    with importlib.import_module('fitz').open(path) as doc: return [func(doc[i]) for i in range(start, end)]
+
+def _map_pages(func, path: str) -> list:
+    """Apply a top-level (picklable) per-page function to every page, in parallel for large PDFs."""
+    with _open_pdf(path) as doc:
+        if doc.page_count <= PARALLEL_MIN_PAGES: return [func(page) for page in doc]
+        n = doc.page_count
+    return _run_ranges(partial(_on_pages, func), path, n)
+
+def _clean_label(label: str) -> str:
+    if label.isascii(): label = '_'.join(label.translate(_ASCII_NON_WORD).split())
+    else: label = _NON_WORD.sub('_', label)
+    return label.strip('_').lower() or _UNNAMED
+
+def _dedup_labels(labels: List[str]) -> List[str]:
+    """Suffix repeated labels with _1, _2, ... in one pass, skipping suffixes already in use."""
+    taken = set(labels)
+    next_suffix: Dict[str, int] = {}
+    out = []
+    for label in labels:
+        n = next_suffix.get(label)
+        if n is None:
+            next_suffix[label] = 1
+            out.append(label)
+            continue
+        while f"{label}_{n}" in taken: n += 1
+        next_suffix[label] = n + 1
+        taken.add(f"{label}_{n}")
+        out.append(f"{label}_{n}")
+    return out
+
+def _open_plumber(path: str, pages=None):
+    data = _pdf_bytes(path)
+    return importlib.import_module('pdfplumber').open(path if data is None else BytesIO(data), pages=pages)
+
+def _plumber_page_tables(pages) -> List[List[List[Optional[str]]]]:
+    tables = []
+    for page in pages:
+        tables.extend(page.extract_tables())
+        # Drop pdfminer's cached layout objects so memory stays flat across long PDFs
+        page.flush_cache()
+    return tables
+
+def _plumber_range(path: str, start: int, end: int) -> List[List[List[Optional[str]]]]:
+    with _open_plumber(path, pages=range(start + 1, end + 1)) as pdf: return _plumber_page_tables(pdf.pages)
+
+def _plumber_tables(path: str) -> List[List[List[Optional[str]]]]:
+    """Extract tables with pdfplumber, splitting large PDFs into page ranges on the shared worker pool."""
+    with _open_plumber(path) as pdf:
+        n = len(pdf.pages)
+        if n <= PARALLEL_MIN_PAGES: return _plumber_page_tables(pdf.pages)
+    return _run_ranges(_plumber_range, path, n)
+
 
 class DocProcessorAgent:
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
-        self.supported = {'.csv', '.xlsx', '.xls', '.txt', '.json', '.pdf'}
+    # Extension -> loader method name, resolved once per call with a single dict probe
+    _LOADERS: ClassVar[Dict[str, str]] = {
+        '.csv': '_load_csv',
+        '.xlsx': '_load_excel', '.xls': '_load_excel',
+        '.json': '_load_json',
+        '.txt': '_load_txt',
+        '.pdf': '_load_pdf'
+    }
+    supported: ClassVar[frozenset] = frozenset(_LOADERS)
+    # Loader method name -> keyword options it accepts from process_file
+    _LOADER_OPTIONS: ClassVar[Dict[str, Tuple[str, ...]]] = {
+        '_load_csv': ('chunk_rows', 'columns', 'schema'),
+        '_load_excel': ('columns',),
+        '_load_json': ('columns',)
+    }
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """`cache_dir` (or env DOC_CACHE_DIR) enables a persistent on-disk result cache."""
+        self.logger = logger
+        cache_dir = cache_dir or os.getenv('DOC_CACHE_DIR')
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        self._cache: "OrderedDict[str, Tuple[pd.DataFrame, Dict[str, Any]]]" = OrderedDict()
+        self._redis = self._connect_redis()
+        self._cache_ttl = int(os.getenv('DOC_CACHE_TTL', '3600'))
 
-    def process_file(self, path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    def process_file(self, path: str, chunk_rows: Optional[int] = None,
+                     columns: Optional[Sequence[str]] = None, no_cache: bool = False,
+                     schema: Optional[Dict[str, Any]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Load a supported file into a normalized DataFrame.
+
+        `chunk_rows` streams CSVs in row chunks; `columns` limits CSV/Excel/JSON loads to the
+        given source (pre-normalization) column names; `no_cache` bypasses every cache tier;
+        `schema` maps source CSV column names to dtypes (e.g. 'int64', 'string') to skip inference.
+        """
         path = Path(path)
-        if not path.exists(): raise FileNotFoundError(f"File not found: {path}")
         ext = path.suffix.lower()
-        if ext not in self.supported: raise ValueError(f"Unsupported: {ext}")
-        loaders = {
-            '.csv': pd.read_csv,
-            '.xlsx': pd.read_excel, '.xls': pd.read_excel,
-            '.json': self._load_json,
-            '.txt': self._load_txt,
-            '.pdf': self._load_pdf
-        }
-        return self._try_load(loaders[ext], str(path), ext.strip('.'))
+        name = self._LOADERS.get(ext)
+        if name is None: raise ValueError(f"Unsupported file type: {ext}")
+        if not path.exists(): raise FileNotFoundError(f"File not found: {path}")
+        if no_cache: key = None
+        else:
+            st = path.stat()
+            key = f"v{CACHE_VERSION}:{ext}:{chunk_rows}:{columns}:{schema}:{_stat_digest(os.path.abspath(path), st.st_mtime_ns, st.st_size)}"
+        hit = key and self._cache_get(key)
+        if hit: return hit
+        opts = {'chunk_rows': chunk_rows, 'columns': columns, 'schema': schema}
+        loader = partial(getattr(self, name), **{k: opts[k] for k in self._LOADER_OPTIONS.get(name, ())})
+        df, meta = self._try_load(loader, str(path), ext.strip('.'))
+        if key and meta['status'] == 'success': self._cache_put(key, df, meta)
+        return df, meta
 
-    def process(self, file_path: str) -> Dict[str, Any]:
-        df, metadata = self.process_file(file_path)
-        tables = [df.values.tolist()] if not df.empty else []
+    def process(self, file_path: str, no_cache: bool = False,
+                schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        df, metadata = self.process_file(file_path, no_cache=no_cache, schema=schema)
+        # Build rows from per-column lists to skip the boxed object ndarray that df.values creates
+        tables = [list(map(list, zip(*(_column_values(df.iloc[:, i]) for i in range(df.shape[1])))))] if not df.empty else []
         return {
             "html": "<html><body><p>Data processed successfully</p></body></html>",
             "json": {
@@ -55,26 +336,181 @@ class DocProcessorAgent:
             self.logger.error(f"Error processing {path}: {e}")
             return pd.DataFrame(), self._meta('failed', ftype, 0, 0, str(e))
 
-    def _load_json(self, p: str) -> pd.DataFrame:
-        with open(p, 'r', encoding='utf-8') as f: data = json.load(f)
-        return pd.DataFrame(data['data'] if isinstance(data, dict) and 'data' in data else data)
+    def _load_csv(self, p, chunk_rows: Optional[int] = None, columns: Optional[Sequence[str]] = None,
+                  schema: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        size = os.path.getsize(p) if isinstance(p, str) else 0
+        mmap = size > MMAP_MIN_BYTES
+        if not chunk_rows and _HAS_PYARROW:
+            try: return _read_csv_arrow(p, columns, mmap, schema)
+            # Arrow rejects ragged rows (e.g. trailing footnotes) that the C engine pads with NaN
+            except importlib.import_module('pyarrow').ArrowInvalid:
+                if hasattr(p, 'seek'): p.seek(0)
+        if not chunk_rows and size <= CHUNKED_MIN_BYTES:
+            df = pd.read_csv(p, usecols=columns, dtype=schema, memory_map=mmap)
+        else:
+            # Chunked reads go through the C engine; the pyarrow reader has no chunked mode
+            with pd.read_csv(p, usecols=columns, dtype=schema, chunksize=chunk_rows or CSV_CHUNK_ROWS,
+                             low_memory=False, memory_map=mmap) as reader:
+                df = pd.concat(reader, ignore_index=True)
+        # usecols keeps file order; reorder to the requested order, as the Arrow reader returns it
+        return df[list(columns)] if columns is not None else df
+
+    def _load_excel(self, p: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        # Rust-backed calamine handles both .xlsx and legacy .xls
+        df = None
+        if _PANDAS_CALAMINE:
+            try: df = pd.read_excel(p, usecols=columns, engine='calamine')
+            except ImportError: pass
+        elif importlib.util.find_spec('python_calamine'):
+            df = _read_excel_calamine(p, columns)
+        if df is None: df = pd.read_excel(p, usecols=columns)
+        # usecols keeps sheet order; reorder to the requested order, matching the CSV and JSON loaders
+        return df[list(columns)] if columns is not None else df
+
+    def _load_json(self, p: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        raw = Path(p).read_bytes()
+        try: data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        # A document that fails to parse as a whole is retried as newline-delimited JSON
+        except ValueError: return _read_json_lines(p, columns)
+        if isinstance(data, dict) and 'data' in data: data = data['data']
+        # Records are flattened one level so nested objects become columns rather than dict cells
+        if isinstance(data, list) and data and isinstance(data[0], dict): df = pd.json_normalize(data, max_level=1)
+        else: df = pd.DataFrame(data)
+        # JSON has no column pushdown, so the subset is taken after parsing
+        return df[list(columns)] if columns is not None else df
 
     def _load_txt(self, p: str) -> pd.DataFrame:
-        with open(p, 'r', encoding='utf-8') as f: c = f.read()
-        try: return pd.read_csv(StringIO(c))
-        except: return pd.DataFrame({'text': c.splitlines()})
+        # Hand raw bytes to the CSV parser; decoding to str is only needed for the plain-text fallback
+        raw = Path(p).read_bytes()
+        if _sniff_csv(raw):
+            try: return self._load_csv(BytesIO(raw))
+            except _CSV_PARSE_ERRORS: pass
+        return pd.DataFrame({'text': raw.decode('utf-8').splitlines()})
 
     def _load_pdf(self, p: str) -> pd.DataFrame:
-        with pdfplumber.open(p) as pdf:
-            text = ''.join(page.extract_text() or '' for page in pdf.pages)
-        try: return pd.read_csv(StringIO(text))
+        merged = _merge_tables(self._extract_tables(p))
+        if merged:
+            # Build the frame straight from the extracted cells instead of re-parsing text as CSV
+            header, body = merged
+            df = pd.DataFrame.from_records(body, columns=header).replace('', None)
+            return df.apply(_to_numeric)
+        text = ''.join(_map_pages(_page_text, p))
+        try: return self._load_csv(BytesIO(text.encode('utf-8')))
         except: return pd.DataFrame({'raw_text': [text[:1000]]})
 
+    def _extract_tables(self, p: str) -> List[List[List[str]]]:
+        """Extract PDF tables with PyMuPDF, falling back to pdfplumber when none are found."""
+        tables = []
+        try:
+            for page_tables in _map_pages(_page_tables, p): tables.extend(page_tables)
+        except Exception as e:
+            self.logger.warning(f"PyMuPDF table extraction failed for {p}: {e}")
+        if not tables:
+            try: tables = _plumber_tables(p)
+            except Exception as e:
+                self.logger.warning(f"pdfplumber table extraction failed for {p}: {e}")
+        return [_clean_table(t) for t in tables]
+
     def _normalize(self, df: pd.DataFrame) -> pd.DataFrame:
         if df.empty: return df
-        df.columns = [re.sub(r'\W+', '_', str(c)).strip('_').lower() or 'unnamed' for c in df.columns]
+        cols = pd.Series(df.columns, dtype=object)
+        labels = [_clean_label(c) for c in cols.where(cols.notna(), '').astype(str)]
+        df.columns = labels if len(set(labels)) == len(labels) else _dedup_labels(labels)
         return df
 
+    def _connect_redis(self):
+        url = os.getenv('REDIS_URL')
+        if not url: return None
+        if redis is None:
+            self.logger.warning("REDIS_URL is set but redis is not installed; using in-process cache only")
+            return None
+        try:
+            return redis.Redis.from_url(url)
+        except Exception as e:
+            self.logger.warning(f"Redis cache disabled: {e}")
+            return None
+
+    def _cache_get(self, key: str):
+        """Return a cached (df, metadata) pair, checking memory, then Redis, then the disk cache."""
+        if key not in self._cache:
+            hit = self._redis_get(key) or self._disk_get(key)
+            if hit is None: return None
+            self._remember(key, *hit)
+        self._cache.move_to_end(key)
+        df, meta = self._cache[key]
+        return df.copy(deep=not _COPY_ON_WRITE), dict(meta)
+
+    def _cache_put(self, key: str, df: pd.DataFrame, meta: Dict[str, Any]):
+        self._remember(key, df.copy(deep=not _COPY_ON_WRITE), dict(meta))
+        self._redis_put(key, df, meta)
+        self._disk_put(key, df, meta)
+
+    def _redis_get(self, key: str):
+        if self._redis is None: return None
+        try:
+            hit = self._redis.hgetall(f"docproc:{key}")
+            return (pd.read_parquet(BytesIO(hit[b'df'])), json.loads(hit[b'meta'])) if hit else None
+        except Exception as e:
+            self.logger.warning(f"Redis cache read failed: {e}")
+            return None
+
+    def _redis_put(self, key: str, df: pd.DataFrame, meta: Dict[str, Any]):
+        if self._redis is None: return
+        try:
+            buf = BytesIO()
+            df.to_parquet(buf)
+            pipe = self._redis.pipeline()
+            pipe.hset(f"docproc:{key}", mapping={'df': buf.getvalue(), 'meta': json.dumps(meta)})
+            pipe.expire(f"docproc:{key}", self._cache_ttl)
+            pipe.execute()
+        except Exception as e:
+            self.logger.warning(f"Redis cache write failed: {e}")
+
+    def _disk_path(self, key: str) -> Path:
+        """Entry stem; the frame is stored as <stem>.parquet and its metadata as <stem>.json."""
+        return self._cache_dir / hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+    def _disk_get(self, key: str):
+        if self._cache_dir is None: return None
+        stem = self._disk_path(key)
+        try:
+            with open(stem.with_suffix('.json'), 'rb') as f: meta = json.load(f)
+            return pd.read_parquet(stem.with_suffix('.parquet')), meta
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Disk cache read failed: {e}")
+            return None
+
+    def _disk_put(self, key: str, df: pd.DataFrame, meta: Dict[str, Any]):
+        """Write the frame, then its metadata; a reader needs both, so a half-written entry is a miss."""
+        if self._cache_dir is None: return
+        try:
+            meta_bytes = json.dumps(meta).encode()
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            stem = self._disk_path(key)
+            self._atomic_write(stem.with_suffix('.parquet'), df.to_parquet)
+            self._atomic_write(stem.with_suffix('.json'), lambda f: f.write(meta_bytes))
+        except Exception as e:
+            self.logger.warning(f"Disk cache write failed: {e}")
+
+    def _atomic_write(self, path: Path, write):
+        """Write through a temp file renamed into place so readers never see a partial file."""
+        tmp = None
+        try:
+            with tempfile.NamedTemporaryFile(dir=self._cache_dir, suffix='.tmp', delete=False) as f:
+                tmp = f.name
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            if tmp and os.path.exists(tmp): os.unlink(tmp)
+            raise
+
+    def _remember(self, key: str, df: pd.DataFrame, meta: Dict[str, Any]):
+        self._cache[key] = (df, meta)
+        self._cache.move_to_end(key)
+        while len(self._cache) > CACHE_SIZE: self._cache.popitem(last=False)
+
     def _meta(self, status: str, ftype: str, rows: int, cols: int, err: str = None) -> Dict[str, Any]:
         m = {'file_type': ftype, 'status': status, 'rows': rows, 'columns': cols}
         if err: m['error'] = err
@@ -82,20 +518,30 @@ class DocProcessorAgent:
 
 
 # Legacy compatibility functions
-def load_csv(file_path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    return DocProcessorAgent()._try_load(pd.read_csv, file_path, 'csv')
+@lru_cache(maxsize=1)
+def _default_agent() -> DocProcessorAgent:
+    """Shared agent for the helpers below, built on first use instead of on every call."""
+    return DocProcessorAgent()
+
+def load_csv(file_path: str, schema: Optional[Dict[str, Any]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    agent = _default_agent()
+    return agent._try_load(partial(agent._load_csv, schema=schema), file_path, 'csv')
 
 def load_excel(file_path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    return DocProcessorAgent()._try_load(pd.read_excel, file_path, 'excel')
+    agent = _default_agent()
+    return agent._try_load(agent._load_excel, file_path, 'excel')
 
 def load_json(file_path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    return DocProcessorAgent()._try_load(DocProcessorAgent()._load_json, file_path, 'json')
+    agent = _default_agent()
+    return agent._try_load(agent._load_json, file_path, 'json')
 
 def load_txt(file_path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    return DocProcessorAgent()._try_load(DocProcessorAgent()._load_txt, file_path, 'txt')
+    agent = _default_agent()
+    return agent._try_load(agent._load_txt, file_path, 'txt')
 
 def load_pdf(file_path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    return DocProcessorAgent()._try_load(DocProcessorAgent()._load_pdf, file_path, 'pdf')
+    agent = _default_agent()
+    return agent._try_load(agent._load_pdf, file_path, 'pdf')
 
 def normalize_headers(df: pd.DataFrame) -> pd.DataFrame:
-    return DocProcessorAgent()._normalize(df)
\ No newline at end of file
+    return _default_agent()._normalize(df)
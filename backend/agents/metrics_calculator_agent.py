@@ -7,6 +7,8 @@ class MetricsCalculatorAgent:
     from document chunks.
     """
 
+    _inputs = ("chunker",)
+
     def __init__(self):
         # Placeholder for config, lookup tables, etc.
         pass
@@ -6,6 +6,8 @@ class VarianceAnalysisAgent:
     supporting budget vs. actual, YoY, QoQ, MoM, and other common use cases.
     """
 
+    _inputs = ("metrics_calculator",)
+
     def __init__(self):
         # Placeholder for config, default periods, etc.
         pass
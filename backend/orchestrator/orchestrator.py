@@ -1,32 +1,75 @@
 # backend/orchestrator/orchestrator.py
 
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+def _find_entry(agent):
+    """Return the name of the agent's first public callable (its main entry point)."""
+    return next(
+        name for name in dir(agent)
+        if not name.startswith("_") and callable(getattr(agent, name))
+    )
+
+
 class Orchestrator:
     """
     Modular, dynamic orchestrator for chaining any agents in any order.
+
+    Agents may declare the upstream agent keys they consume via an `_inputs`
+    class attribute; their outputs are passed positionally in that order.
+    Agents without declared inputs (or whose inputs are not earlier in the
+    sequence) receive the previous agent's output, as in a plain chain.
+    Agents whose inputs are ready run concurrently on a thread pool; a
+    sequence where each agent depends on the one before it runs inline.
     """
 
-    def __init__(self, agents: dict, agent_sequence: list):
+    def __init__(self, agents: dict, agent_sequence: list, max_workers: int = None):
         """
         Args:
             agents (dict): Dictionary of agent instances keyed by agent name.
             agent_sequence (list): List of agent keys in execution order.
+            max_workers (int, optional): Thread pool size for independent agents.
         """
         self.agents = agents
         self.agent_sequence = agent_sequence
+        self.max_workers = max_workers
+        # Entry points are resolved once here rather than via dir() on every run.
+        # Steps are tracked by position, so a key may appear more than once in the sequence.
+        self._methods = [getattr(agents[key], _find_entry(agents[key])) for key in agent_sequence]
+        self._deps = []
+        latest = {}
+        for i, key in enumerate(agent_sequence):
+            declared = tuple(getattr(agents[key], "_inputs", ()))
+            if declared and all(dep in latest for dep in declared):
+                self._deps.append(tuple(latest[dep] for dep in declared))
+            else:
+                self._deps.append((i - 1,) if i else ())
+            latest[key] = i
+        # When every step waits on the one before it nothing can overlap, so the pool is skipped
+        self._chain = all(i - 1 in deps for i, deps in enumerate(self._deps) if i)
+
+    def _args(self, i, outputs, initial_input):
+        return [outputs[dep] for dep in self._deps[i]] or [initial_input]
 
     def run_pipeline(self, initial_input):
         outputs = {}
-        prev_output = initial_input
-
-        for agent_key in self.agent_sequence:
-            agent = self.agents[agent_key]
-            # Dynamically find the main callable method (skip __ methods)
-            method = [
-                func for func in dir(agent)
-                if not func.startswith("__") and callable(getattr(agent, func))
-            ][0]
-            result = getattr(agent, method)(prev_output)
-            outputs[agent_key] = result
-            prev_output = result  # Chain output to next agent by default
-
-        return outputs
+        if self._chain:
+            for i, method in enumerate(self._methods):
+                outputs[i] = method(*self._args(i, outputs, initial_input))
+        else:
+            remaining = list(range(len(self._methods)))
+            running = {}
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                while remaining or running:
+                    ready = [i for i in remaining if all(dep in outputs for dep in self._deps[i])]
+                    if not ready and not running:
+                        raise RuntimeError(f"Unresolvable agent dependencies: {[self.agent_sequence[i] for i in remaining]}")
+                    for i in ready:
+                        remaining.remove(i)
+                        running[executor.submit(self._methods[i], *self._args(i, outputs, initial_input))] = i
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        outputs[running.pop(future)] = future.result()
+
+        # A repeated key reports its last run, as the sequential chain did
+        return {key: outputs[i] for i, key in enumerate(self.agent_sequence)}
@@ -1,81 +1,316 @@
 import pytest
 import pandas as pd
-import tempfile
 import os
 import json
+import fitz
 
 # Add backend to path for imports
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import agents.doc_processor_agent as dpa
 from agents.doc_processor_agent import DocProcessorAgent, load_csv, normalize_headers
 
 
+@pytest.fixture(scope="module")
+def agent():
+    return DocProcessorAgent()
+
+
 class TestDocProcessorAgent:
-    def setup_method(self):
-        self.agent = DocProcessorAgent()
-        self.temp_dir = tempfile.mkdtemp()
-    
-    def teardown_method(self):
-        import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
-    
-    @pytest.mark.parametrize("ext,content,expected_cols", [
-        ("csv", "Name,Age\nJohn,25\nJane,30", ['name', 'age']),
-        ("xlsx", {"Name": ["John"], "Age": [25]}, ['name', 'age']),
-        ("json", [{"id": 1, "name": "Test"}], ['id', 'name']),
-        ("txt", "Name,Score\nAlice,95", ['name', 'score']),
-    ])
-    def test_file_types(self, ext, content, expected_cols):
-        if ext == "csv":
-            file_path = os.path.join(self.temp_dir, "test.csv")
-            with open(file_path, 'w') as f: f.write(content)
-        elif ext == "xlsx":
-            file_path = os.path.join(self.temp_dir, "test.xlsx")
-            pd.DataFrame(content).to_excel(file_path, index=False)
-        elif ext == "json":
-            file_path = os.path.join(self.temp_dir, "test.json")
-            with open(file_path, 'w') as f: json.dump(content, f)
-        elif ext == "txt":
-            file_path = os.path.join(self.temp_dir, "test.txt")
-            with open(file_path, 'w') as f: f.write(content)
-        
-        df, metadata = self.agent.process_file(file_path)
+    @pytest.mark.parametrize("writer,suffix,expected_cols", [
+        (lambda p: p.write_text("Name,Age\nJohn,25\nJane,30"), "csv", ['name', 'age']),
+        (lambda p: pd.DataFrame({"Name": ["John"], "Age": [25]}).to_excel(p, index=False), "xlsx", ['name', 'age']),
+        (lambda p: p.write_text(json.dumps([{"id": 1, "name": "Test"}])), "json", ['id', 'name']),
+        (lambda p: p.write_text("Name,Score\nAlice,95"), "txt", ['name', 'score']),
+        (lambda p: p.write_text("hello world\nfoo, bar\nbaz"), "txt", ['text']),
+        (lambda p: p.write_text("Amount\n100\n200\n"), "txt", ['amount']),
+    ], ids=["csv", "xlsx", "json", "txt_csv", "txt_plain", "txt_single_column"])
+    def test_file_types(self, agent, writer, suffix, expected_cols, tmp_path):
+        file_path = tmp_path / f"test.{suffix}"
+        writer(file_path)
+        df, metadata = agent.process_file(file_path)
         assert not df.empty
         assert list(df.columns) == expected_cols
         assert metadata['status'] == 'success'
+        assert metadata['file_type'] == suffix
     
-    def test_errors(self):
+    def test_errors(self, agent):
         # Unsupported extension
-        with pytest.raises(ValueError):
-            self.agent.process_file("test.xyz")
+        with pytest.raises(ValueError, match="Unsupported file type"):
+            agent.process_file("test.xyz")
         # File not found
         with pytest.raises(FileNotFoundError):
-            self.agent.process_file("nonexistent.csv")
+            agent.process_file("nonexistent.csv")
     
-    def test_legacy_process(self):
-        csv_path = os.path.join(self.temp_dir, "test.csv")
-        with open(csv_path, 'w') as f: f.write("Name,Age\nJohn,25")
-        result = self.agent.process(csv_path)
+    def test_logger_attribute(self, agent):
+        assert agent.logger is dpa.logger
+
+    def test_legacy_process(self, agent, tmp_path):
+        csv_path = tmp_path / "test.csv"
+        csv_path.write_text("Name,Age\nJohn,25")
+        result = agent.process(csv_path)
         assert 'tables' in result['json']
         assert len(result['json']['tables']) == 1
 
+    def test_legacy_process_missing_values(self, agent, tmp_path):
+        csv_path = tmp_path / "test.csv"
+        csv_path.write_text("a,b,c\n1,,x\n2,3.5,\n")
+        result = agent.process(csv_path)
+        assert json.loads(json.dumps(result))['json']['tables'][0] == [[1, None, 'x'], [2, 3.5, None]]
+
+    def test_chunked_csv(self, agent, tmp_path):
+        csv_path = tmp_path / "test.csv"
+        csv_path.write_text("Name,Age\nJohn,25\nJane,30\nJim,41")
+        df, meta = agent.process_file(csv_path, chunk_rows=2)
+        assert df['age'].tolist() == [25, 30, 41]
+        assert meta['rows'] == 3
+
+    def test_ragged_csv(self, agent, tmp_path):
+        csv_path = tmp_path / "test.csv"
+        csv_path.write_text("a,b\n1,2\n3\n")
+        df, meta = agent.process_file(csv_path)
+        assert meta['status'] == 'success'
+        assert df['a'].tolist() == [1, 3]
+        assert pd.isna(df['b'].iloc[1])
+
+    @pytest.mark.parametrize("content", ["a,b\n1,2\n3,4", "a,b\n1,\n3,4", "a,b\nx,1\ny,2"])
+    def test_dtypes_match_across_readers(self, agent, tmp_path, content):
+        csv_path = tmp_path / "test.csv"
+        csv_path.write_text(content)
+        whole, _ = agent.process_file(csv_path, no_cache=True)
+        chunked, _ = agent.process_file(csv_path, chunk_rows=1, no_cache=True)
+        assert whole.dtypes.tolist() == chunked.dtypes.tolist()
+
+    def test_column_subset(self, agent, tmp_path):
+        csv_path = tmp_path / "test.csv"
+        csv_path.write_text("Name,Age,City\nJohn,25,Austin")
+        df, meta = agent.process_file(csv_path, columns=['Name', 'City'])
+        assert list(df.columns) == ['name', 'city']
+        assert meta['columns'] == 2
+
+    @pytest.mark.parametrize("chunk_rows", [None, 1])
+    def test_column_subset_order(self, agent, tmp_path, chunk_rows):
+        csv_path = tmp_path / "test.csv"
+        csv_path.write_text("a,b,c\n1,2,3")
+        df, _ = agent.process_file(csv_path, chunk_rows=chunk_rows, columns=['c', 'a'])
+        assert list(df.columns) == ['c', 'a']
+
+    def test_txt_unexpected_error_not_swallowed(self, tmp_path):
+        txt_path = tmp_path / "test.txt"
+        txt_path.write_text("Name,Score\nAlice,95")
+        agent = DocProcessorAgent()
+        def broken(p): raise RuntimeError("reader bug")
+        agent._load_csv = broken
+        _, meta = agent.process_file(txt_path)
+        assert meta['status'] == 'failed'
+        assert meta['error'] == 'reader bug'
+
+    def test_csv_schema(self, agent, tmp_path):
+        csv_path = tmp_path / "test.csv"
+        csv_path.write_text("Name,Age\nJohn,25")
+        df, meta = agent.process_file(csv_path, schema={'Age': 'float64'})
+        assert df['age'].tolist() == [25.0]
+        assert pd.api.types.is_float_dtype(df['age'])
+
+    def test_ndjson(self, agent, tmp_path):
+        json_path = tmp_path / "test.json"
+        json_path.write_text('{"id": 1, "name": "A"}\n{"id": 2, "name": "B"}\n')
+        df, meta = agent.process_file(json_path)
+        assert list(df.columns) == ['id', 'name']
+        assert meta['rows'] == 2
+
+    def test_cache_hit(self, tmp_path):
+        csv_path = tmp_path / "test.csv"
+        csv_path.write_text("Name,Age\nJohn,25")
+        # A private agent so the shared fixture's cache does not affect the count
+        agent = DocProcessorAgent()
+        df1, _ = agent.process_file(csv_path)
+        df1['name'] = 'changed'
+        df2, meta = agent.process_file(csv_path)
+        assert len(agent._cache) == 1
+        assert df2['name'].tolist() == ['John']
+        assert meta['status'] == 'success'
+
+    @pytest.mark.parametrize("copy_on_write", [True, False])
+    def test_cache_hit_isolated_from_inplace_edits(self, tmp_path, monkeypatch, copy_on_write):
+        monkeypatch.setattr(dpa, '_COPY_ON_WRITE', copy_on_write)
+        csv_path = tmp_path / "test.csv"
+        csv_path.write_text("Name,Age\nJohn,25")
+        agent = DocProcessorAgent()
+        df1, _ = agent.process_file(csv_path)
+        df1.loc[0, 'name'] = 'changed'
+        df2, _ = agent.process_file(csv_path)
+        df2.loc[0, 'name'] = 'changed again'
+        assert agent.process_file(csv_path)[0]['name'].tolist() == ['John']
+
+    def test_disk_cache(self, tmp_path):
+        csv_path = tmp_path / "test.csv"
+        csv_path.write_text("Name,Age\nJohn,25")
+        cache_dir = tmp_path / "cache"
+        DocProcessorAgent(cache_dir=cache_dir).process_file(csv_path)
+        assert sorted(p.suffix for p in cache_dir.iterdir()) == ['.json', '.parquet']
+        fresh = DocProcessorAgent(cache_dir=cache_dir)
+        fresh._load_csv = None  # a disk hit must not reach the loader
+        df, meta = fresh.process_file(csv_path)
+        assert list(df.columns) == ['name', 'age']
+        assert meta['status'] == 'success'
+
+    def test_disk_cache_failed_write(self, tmp_path):
+        cache_dir = tmp_path / "cache"
+        # A lambda is not JSON-serializable, so the write fails before anything is stored
+        DocProcessorAgent(cache_dir=cache_dir)._disk_put("key", pd.DataFrame(), {'bad': lambda: None})
+        assert not cache_dir.exists() or os.listdir(cache_dir) == []
+
+    def test_disk_cache_failed_frame_write(self, tmp_path):
+        cache_dir = tmp_path / "cache"
+        # Mixed int/str object columns cannot be written to parquet
+        DocProcessorAgent(cache_dir=cache_dir)._disk_put("key", pd.DataFrame({'a': [1, 'x']}), {})
+        assert os.listdir(cache_dir) == []
+
+    def test_disk_cache_version_in_key(self, tmp_path, monkeypatch):
+        csv_path = tmp_path / "test.csv"
+        csv_path.write_text("Name,Age\nJohn,25")
+        cache_dir = tmp_path / "cache"
+        DocProcessorAgent(cache_dir=cache_dir).process_file(csv_path)
+        monkeypatch.setattr(dpa, 'CACHE_VERSION', dpa.CACHE_VERSION + 1)
+        fresh = DocProcessorAgent(cache_dir=cache_dir)
+        loads = []
+        fresh._load_csv = lambda p, **kw: loads.append(p) or pd.read_csv(p)
+        fresh.process_file(csv_path)
+        assert len(loads) == 1
+
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis-py client calls the agent makes."""
+    def __init__(self, fail=False): self.store, self.ttl, self.fail = {}, {}, fail
+    def hgetall(self, name):
+        if self.fail: raise ConnectionError("redis down")
+        return self.store.get(name, {})
+    def pipeline(self): return self
+    def hset(self, name, mapping):
+        self.store[name] = {k.encode(): v.encode() if isinstance(v, str) else v for k, v in mapping.items()}
+    def expire(self, name, seconds): self.ttl[name] = seconds
+    def execute(self): pass
+
+
+class TestRedisCache:
+    def test_round_trip(self, tmp_path):
+        csv_path = tmp_path / "test.csv"
+        csv_path.write_text("Name,Age\nJohn,25")
+        client = FakeRedis()
+        writer = DocProcessorAgent()
+        writer._redis = client
+        writer.process_file(csv_path)
+        assert list(client.ttl.values()) == [writer._cache_ttl]
+        reader = DocProcessorAgent()
+        reader._redis = client
+        reader._load_csv = None  # a Redis hit must not reach the loader
+        df, meta = reader.process_file(csv_path)
+        assert df['name'].tolist() == ['John']
+        assert meta['status'] == 'success'
+
+    def test_read_failure_falls_back_to_loader(self, tmp_path):
+        csv_path = tmp_path / "test.csv"
+        csv_path.write_text("Name,Age\nJohn,25")
+        agent = DocProcessorAgent()
+        agent._redis = FakeRedis(fail=True)
+        df, meta = agent.process_file(csv_path)
+        assert meta['status'] == 'success'
+        assert df['age'].tolist() == [25]
+
+    def test_connect_without_redis_installed(self, monkeypatch):
+        monkeypatch.setenv('REDIS_URL', 'redis://localhost:6379/0')
+        monkeypatch.setattr(dpa, 'redis', None)
+        assert DocProcessorAgent()._redis is None
+
+
+PDF_ROWS = [["Year", "Revenue"], ["2023", "100"], ["2024", "120.5"]]
+
+
+def write_pdf(path, pages=1, tables=None, lines=()):
+    """Write a PDF with a ruled grid of `tables[i]` rows and line `i` of `lines` on page `i`."""
+    doc = fitz.open()
+    for n in range(pages):
+        page = doc.new_page()
+        if n < len(lines): page.insert_text((72, 400), lines[n], fontsize=11)
+        for r, row in enumerate((tables or {}).get(n, ())):
+            for c, cell in enumerate(row):
+                rect = fitz.Rect(72 + c * 120, 72 + r * 24, 192 + c * 120, 96 + r * 24)
+                page.draw_rect(rect, color=(0, 0, 0), width=1)
+                page.insert_text((rect.x0 + 4, rect.y1 - 7), cell, fontsize=11)
+    doc.save(str(path))
+    return path
+
+
+class TestPdf:
+    # More pages than PARALLEL_MIN_PAGES, so extraction goes through the process pools
+    PAGES = dpa.PARALLEL_MIN_PAGES + 2
+
+    def test_table_across_pages(self, agent, tmp_path):
+        pdf_path = write_pdf(tmp_path / "test.pdf", self.PAGES, tables={self.PAGES - 2: PDF_ROWS})
+        df, meta = agent.process_file(pdf_path)
+        assert meta['status'] == 'success'
+        assert list(df.columns) == ['year', 'revenue']
+        assert df['year'].tolist() == [2023, 2024]
+        assert df['revenue'].tolist() == [100.0, 120.5]
+
+    def test_tables_merged(self, agent, tmp_path):
+        # A repeated header on a later page and a headerless continuation table both join the first table
+        tables = {0: PDF_ROWS, 2: [PDF_ROWS[0], ["2025", "130"]], 4: [["2026", "140"]]}
+        df, meta = agent.process_file(write_pdf(tmp_path / "test.pdf", self.PAGES, tables=tables))
+        assert list(df.columns) == ['year', 'revenue']
+        assert df['year'].tolist() == [2023, 2024, 2025, 2026]
+        assert meta['rows'] == 4
+
+    def test_text_across_pages(self, agent, tmp_path):
+        lines = ["Name,Age"] + [f"P{i},{i}" for i in range(1, self.PAGES)]
+        df, meta = agent.process_file(write_pdf(tmp_path / "test.pdf", self.PAGES, lines=lines))
+        assert list(df.columns) == ['name', 'age']
+        assert df['age'].tolist() == list(range(1, self.PAGES))
+
+    def test_plumber_failure_falls_back_to_text(self, agent, tmp_path, monkeypatch):
+        def broken(path): raise RuntimeError("pdfminer broke")
+        monkeypatch.setattr(dpa, '_plumber_tables', broken)
+        df, meta = agent.process_file(write_pdf(tmp_path / "test.pdf", lines=["Name,Age\nJohn,25"]), no_cache=True)
+        assert meta['status'] == 'success'
+        assert list(df.columns) == ['name', 'age']
+
+    def test_plumber_tables(self, tmp_path):
+        pdf_path = write_pdf(tmp_path / "test.pdf", self.PAGES, tables={1: PDF_ROWS})
+        assert dpa._plumber_tables(str(pdf_path)) == [PDF_ROWS]
+
+    def test_file_handle_open(self, agent, tmp_path, monkeypatch):
+        # Below the in-memory threshold PDFs are read from a buffer; force the file-handle path
+        monkeypatch.setattr(dpa, 'IN_MEMORY_PDF_BYTES', 0)
+        pdf_path = write_pdf(tmp_path / "test.pdf", tables={0: PDF_ROWS})
+        assert dpa._pdf_bytes(str(pdf_path)) is None
+        df, _ = agent.process_file(pdf_path, no_cache=True)
+        assert df['revenue'].tolist() == [100.0, 120.5]
+
 
 class TestHelpers:
     def test_normalize_headers(self):
         df = pd.DataFrame({'  Name  ': ['John'], 'Age (Years)': [25], None: ['data']})
         normalized = normalize_headers(df)
         assert list(normalized.columns) == ['name', 'age_years', 'unnamed']
+
+    def test_normalize_headers_duplicates(self):
+        df = pd.DataFrame([[1, 2, 3]], columns=['Net Income', 'net-income', 'NET_INCOME'])
+        assert list(normalize_headers(df).columns) == ['net_income', 'net_income_1', 'net_income_2']
+        df = pd.DataFrame([[1, 2, 3]], columns=['eps', 'EPS', 'eps_1'])
+        assert list(normalize_headers(df).columns) == ['eps', 'eps_2', 'eps_1']
     
-    def test_legacy_functions(self):
-        csv_path = os.path.join(tempfile.mkdtemp(), "test.csv")
-        with open(csv_path, 'w') as f: f.write("Name,Age\nJohn,25")
-        try:
-            df, meta = load_csv(csv_path)
-            assert not df.empty
-            assert meta['status'] == 'success'
-        finally:
-            os.unlink(csv_path)
+    def test_merge_tables_width_mismatch(self):
+        assert dpa._merge_tables([PDF_ROWS, [["a", "b", "c"]]]) is None
+
+    def test_legacy_functions(self, tmp_path):
+        csv_path = tmp_path / "test.csv"
+        csv_path.write_text("Name,Age\nJohn,25")
+        df, meta = load_csv(str(csv_path))
+        assert not df.empty
+        assert meta['status'] == 'success'
 
 
 if __name__ == "__main__":
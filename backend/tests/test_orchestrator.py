@@ -0,0 +1,57 @@
+import pytest
+import os
+import threading
+
+# Add backend to path for imports
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from orchestrator.orchestrator import Orchestrator
+
+
+class Add:
+    def __init__(self, n): self.n = n
+    def run(self, x): return x + self.n
+
+
+class Source:
+    def run(self, x): return x
+
+
+class Branch:
+    _inputs = ("source",)
+    def __init__(self, barrier, n): self.barrier, self.n = barrier, n
+    def run(self, x):
+        # Both branches must be in flight at once for the barrier to release
+        self.barrier.wait()
+        return x * self.n
+
+
+class Join:
+    _inputs = ("left", "right")
+    def run(self, left, right): return left + right
+
+
+class TestOrchestrator:
+    def test_fan_out(self):
+        barrier = threading.Barrier(2, timeout=5)
+        agents = {"source": Source(), "left": Branch(barrier, 2), "right": Branch(barrier, 3), "join": Join()}
+        pipeline = Orchestrator(agents, ["source", "left", "right", "join"])
+        assert not pipeline._chain
+        assert pipeline.run_pipeline(1) == {"source": 1, "left": 2, "right": 3, "join": 5}
+
+    def test_fallback_to_previous_output(self):
+        # Join's declared inputs are absent, so it falls back to chaining and gets one argument
+        agents = {"a": Add(1), "b": Add(10), "join": Add(100)}
+        agents["join"]._inputs = ("left", "right")
+        pipeline = Orchestrator(agents, ["a", "b", "join"])
+        assert pipeline._chain
+        assert pipeline.run_pipeline(0) == {"a": 1, "b": 11, "join": 111}
+
+    def test_duplicate_keys(self):
+        agents = {"a": Add(1), "b": Add(2)}
+        assert Orchestrator(agents, ["a", "b", "a"]).run_pipeline(0) == {"a": 4, "b": 3}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
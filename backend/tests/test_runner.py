@@ -13,7 +13,8 @@ if __name__ == "__main__":
     logging.debug(f"Exists? {os.path.exists(path)}")
     logging.debug(f"Full path: {path}")
 
-    agent = DocProcessorAgent()
+    # Extracted tables persist under .cache/, so reruns on an unchanged PDF skip parsing
+    agent = DocProcessorAgent(cache_dir=os.path.join(os.path.dirname(__file__), "..", ".cache", "doc_processor"))
     output = agent.process(path)
     metadata = output["json"]["metadata"]
     logging.info(f"Extraction status: {metadata.get('extraction_status')}")
@@ -1,8 +1,9 @@
 #!/usr/bin/env python
-"""Test script for Apple CSV processing with DocProcessorAgent."""
+"""Smoke test for Apple CSV processing with DocProcessorAgent."""
 
 import sys
 import os
+import pytest
 
 # Add backend to Python path
 backend_path = os.path.join(os.path.dirname(__file__), 'backend')
@@ -11,55 +12,71 @@ sys.path.insert(0, backend_path)
 # Import the agent
 from agents.doc_processor_agent import DocProcessorAgent
 
-# Create agent instance
-agent = DocProcessorAgent()
+csv_path = os.path.join(backend_path, 'data', 'sample_reports', 'Apple 2009-2024.csv')
+sample_cols = ['year', 'revenue_millions', 'net_income_millions', 'eps']
 
-# Process the Apple CSV file
-csv_path = os.path.join('backend', 'data', 'sample_reports', 'Apple 2009-2024.csv')
-print(f"Processing file: {csv_path}")
-print(f"File exists: {os.path.exists(csv_path)}")
-print()
 
-df, metadata = agent.process_file(csv_path)
+@pytest.mark.skipif(not os.path.exists(csv_path), reason="Apple sample CSV not available")
+def test_apple_csv_smoke():
+    agent = DocProcessorAgent()
+    df, metadata = agent.process_file(csv_path)
+    assert metadata['status'] == 'success'
+    assert metadata['file_type'] == 'csv'
+    assert metadata['rows'] == len(df) > 0
+    assert set(sample_cols) <= set(df.columns)
+    assert df['year'].min() <= df['year'].max()
 
-# Display results
-print("=" * 60)
-print("Apple CSV Processing Test Results")
-print("=" * 60)
+    legacy = agent.process(csv_path)['json']['metadata']
+    assert legacy['extraction_status'] == 'success'
+    assert legacy['table_count'] == 1
+    assert (legacy['rows'], legacy['columns']) == (metadata['rows'], metadata['columns'])
 
-print("\nMETADATA:")
-print(f"  File Type: {metadata['file_type']}")
-print(f"  Status: {metadata['status']}")
-print(f"  Rows: {metadata['rows']}")
-print(f"  Columns: {metadata['columns']}")
 
-print("\nDATAFRAME INFO:")
-print(f"  Shape: {df.shape}")
-print(f"  Memory usage: {df.memory_usage(deep=True).sum() / 1024:.2f} KB")
+def report():
+    """Print a human-readable summary of the processed Apple CSV."""
+    agent = DocProcessorAgent()
+    print(f"Processing file: {csv_path}")
+    print(f"File exists: {os.path.exists(csv_path)}")
+    print()
 
-print("\nNORMALIZED COLUMN NAMES:")
-for i, col in enumerate(df.columns, 1):
-    print(f"  {i:2d}. {col}")
+    df, metadata = agent.process_file(csv_path)
 
-print("\nFIRST 3 ROWS (Recent Data):")
-sample_cols = ['year', 'revenue_millions', 'net_income_millions', 'eps']
-print(df.head(3)[sample_cols].to_string(index=False))
+    # Display results
+    print("=" * 60)
+    print("Apple CSV Processing Test Results")
+    print("=" * 60)
+
+    print("\nMETADATA:")
+    print(f"  File Type: {metadata['file_type']}")
+    print(f"  Status: {metadata['status']}")
+    print(f"  Rows: {metadata['rows']}")
+    print(f"  Columns: {metadata['columns']}")
+
+    print("\nDATAFRAME INFO:")
+    print(f"  Shape: {df.shape}")
+    print(f"  Memory usage: {df.memory_usage(deep=False).sum() / 1024:.2f} KB")
+
+    print("\nNORMALIZED COLUMN NAMES:")
+    for i, col in enumerate(df.columns, 1):
+        print(f"  {i:2d}. {col}")
+
+    print("\nFIRST 3 ROWS (Recent Data):")
+    print(df.head(3)[sample_cols].to_csv(index=False, sep='\t'), end='')
 
-print("\nLAST 3 ROWS (Historical Data):")
-print(df.tail(3)[sample_cols].to_string(index=False))
+    print("\nLAST 3 ROWS (Historical Data):")
+    print(df.tail(3)[sample_cols].to_csv(index=False, sep='\t'), end='')
 
-print("\nSUMMARY STATISTICS:")
-print(f"  Years covered: {df['year'].min()} - {df['year'].max()}")
-print(f"  Total data points: {len(df)} years")
+    print("\nSUMMARY STATISTICS:")
+    print(f"  Years covered: {df['year'].min()} - {df['year'].max()}")
+    print(f"  Total data points: {len(df)} years")
 
-print("\nLEGACY process() METHOD TEST:")
-legacy_result = agent.process(csv_path)
-print(f"  Tables extracted: {legacy_result['json']['metadata']['table_count']}")
-print(f"  Rows in table: {legacy_result['json']['metadata']['rows']}")
-print(f"  Columns in table: {legacy_result['json']['metadata']['columns']}")
-print(f"  Extraction status: {legacy_result['json']['metadata']['extraction_status']}")
+    print("\nLEGACY process() METHOD TEST:")
+    legacy_result = agent.process(csv_path)
+    print(f"  Tables extracted: {legacy_result['json']['metadata']['table_count']}")
+    print(f"  Rows in table: {legacy_result['json']['metadata']['rows']}")
+    print(f"  Columns in table: {legacy_result['json']['metadata']['columns']}")
+    print(f"  Extraction status: {legacy_result['json']['metadata']['extraction_status']}")
 
-print("\n" + "=" * 60)
-print("SUCCESS! DocProcessorAgent working perfectly!")
-print("=" * 60)
 
+if __name__ == "__main__":
+    report()
@@ -1,21 +1,36 @@
 import sys
-sys.path.insert(0, 'backend')
+import os
+import pytest
+
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
 
 from agents.doc_processor_agent import DocProcessorAgent
 
-agent = DocProcessorAgent()
-df, metadata = agent.process_file('backend/data/sample_reports/Apple 2009-2024.csv')
-
-print("Apple CSV Processing Test")
-print("-" * 40)
-print("Status:", metadata['status'])
-print("Rows:", metadata['rows'])
-print("Columns:", metadata['columns'])
-print()
-print("Column Names:")
-for col in df.columns:
-    print(" -", col)
-print()
-print("First 3 rows:")
-print(df.head(3))
+csv_path = os.path.join(backend_path, 'data', 'sample_reports', 'Apple 2009-2024.csv')
+
+
+@pytest.mark.skipif(not os.path.exists(csv_path), reason="Apple sample CSV not available")
+def test_apple_csv_simple():
+    df, metadata = DocProcessorAgent().process_file(csv_path)
+    assert metadata['status'] == 'success'
+    assert metadata['rows'] == len(df)
+    assert metadata['columns'] == len(df.columns)
+    assert all(col == col.lower() for col in df.columns)
+
+
+if __name__ == "__main__":
+    df, metadata = DocProcessorAgent().process_file(csv_path)
 
+    print("Apple CSV Processing Test")
+    print("-" * 40)
+    print("Status:", metadata['status'])
+    print("Rows:", metadata['rows'])
+    print("Columns:", metadata['columns'])
+    print()
+    print("Column Names:")
+    for col in df.columns:
+        print(" -", col)
+    print()
+    print("First 3 rows:")
+    print(df.head(3))